@@ -35,7 +35,7 @@ from casinotao.base.utils.weight_utils import (
 from casinotao.utils.config import add_validator_args
 
 # Casino TAO imports
-from casinotao.validator.database import init_db, save_snapshot
+from casinotao.validator.database import init_db, prewarm_db, save_snapshot
 from casinotao.validator.api import start_api_server
 from casinotao.core.const import API_PORT
 
@@ -95,6 +95,7 @@ class BaseValidatorNeuron(BaseNeuron):
         bt.logging.info("Initializing Casino TAO database...")
         try:
             init_db()
+            prewarm_db()
         except Exception as e:
             bt.logging.error(f"Failed to initialize database: {e}")
 
@@ -330,18 +331,10 @@ class BaseValidatorNeuron(BaseNeuron):
             
             # ===== Casino TAO: Save snapshot after successful weight setting =====
             try:
-                scores_dict = {
-                    int(uid): float(self.scores[uid]) 
-                    for uid in range(len(self.scores))
-                }
-                volumes_dict = {
-                    int(uid): float(vol) 
-                    for uid, vol in self.miner_volumes.items()
-                }
                 save_snapshot(
                     block_number=self.block,
-                    scores=scores_dict,
-                    volumes=volumes_dict
+                    scores=self.scores,
+                    volumes=self.miner_volumes
                 )
                 bt.logging.info(f"Snapshot saved at block {self.block}")
             except Exception as e:
@@ -12,10 +12,12 @@ from .database import (
     update_miner_data,
     get_miner_data,
     get_all_miner_data,
+    iter_all_miner_data,
     # Wallet mapping functions
     save_wallet_mapping,
     get_wallet_mapping,
     get_evm_address_for_coldkey,
+    get_evm_addresses_for_coldkeys,
     get_all_wallet_mappings,
 )
 
@@ -24,7 +24,7 @@ from casinotao.core.const import (
     BLOCKS_PER_DAY,
     TIME_DECAY_WEIGHTS,
 )
-from casinotao.validator.database import cache_bet_event, get_cached_bet_events
+from casinotao.validator.database import cache_bet_events_bulk, get_cached_bet_events
 
 
 # casinotao ABI - only the functions/events we need
@@ -158,6 +158,7 @@ class ContractClient:
             })
             
             bet_events = []
+            cache_rows = []
             for log in logs:
                 try:
                     # Decode the event data
@@ -181,20 +182,23 @@ class ContractClient:
                     }
                     bet_events.append(bet_event)
                     
-                    # Cache the event with contract address
-                    cache_bet_event(
-                        evm_address=address.lower(),
-                        game_id=bet_event['game_id'],
-                        amount=float(self.w3.from_wei(bet_event['amount'], 'ether')),
-                        side=bet_event['side'],
-                        block_number=bet_event['block_number'],
-                        timestamp=bet_event['timestamp'],
-                        contract_address=self.contract_address
-                    )
+                    # Queue the event for caching with contract address
+                    cache_rows.append((
+                        self.contract_address,
+                        address.lower(),
+                        bet_event['game_id'],
+                        float(self.w3.from_wei(bet_event['amount'], 'ether')),
+                        bet_event['side'],
+                        bet_event['block_number'],
+                        bet_event['timestamp'],
+                    ))
                 except Exception as decode_err:
                     bt.logging.debug(f"Error decoding log: {decode_err}")
                     continue
             
+            # Cache all decoded events in one transaction
+            cache_bet_events_bulk(cache_rows)
+            
             return bet_events
             
         except Exception as e:
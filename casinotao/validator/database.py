@@ -6,18 +6,294 @@ Database module for Casino TAO validator.
 Handles snapshots and miner volume tracking using SQLite.
 """
 
+import math
 import sqlite3
-import json
-from datetime import datetime
-from typing import Dict, List, Optional
+import struct
+import time
+import atexit
+import threading
+import weakref
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Union
+import numpy as np
+import orjson
 import bittensor as bt
 
 from casinotao.core.const import DB_PATH, CASINOTAO_CONTRACT_ADDRESS
 
 
+# One long-lived connection per thread (validator loop, API workers)
+_STATEMENT_CACHE_SIZE = 256
+_local = threading.local()
+_connections_lock = threading.Lock()
+
+
+class _Connection(sqlite3.Connection):
+    """sqlite3.Connection that supports weak references."""
+
+
+# Weak so a connection is closed (by garbage collection) once its thread exits
+_connections: 'weakref.WeakSet[_Connection]' = weakref.WeakSet()
+
+
 def _get_connection():
-    """Get a database connection."""
-    return sqlite3.connect(DB_PATH)
+    """
+    Get the database connection for the calling thread.
+    
+    The connection is opened once per thread and reused, so callers must
+    not close it. WAL mode lets API readers proceed while the validator writes.
+    """
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        conn = sqlite3.connect(
+            DB_PATH,
+            check_same_thread=False,
+            cached_statements=_STATEMENT_CACHE_SIZE,
+            detect_types=sqlite3.PARSE_COLNAMES,
+            factory=_Connection,
+        )
+        # Rows support both row[0] and row['name'], and dict(row) converts in C
+        conn.row_factory = sqlite3.Row
+        # SQLite has no built-in log1p; NULL amounts stay NULL like built-in math functions
+        conn.create_function('log1p', 1, _log1p, deterministic=True)
+        # page_size only applies to a new database file, so set it before WAL
+        conn.execute('PRAGMA page_size=8192')
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('PRAGMA temp_store=MEMORY')
+        conn.execute('PRAGMA mmap_size=536870912')
+        conn.execute('PRAGMA cache_size=-65536')
+        # Deleted pages need not be zeroed; some builds enable secure_delete by default
+        conn.execute('PRAGMA secure_delete=OFF')
+        _local.conn = conn
+        with _connections_lock:
+            _connections.add(conn)
+    return conn
+
+
+def _log1p(x: Optional[float]) -> Optional[float]:
+    """SQL log1p(): NULL-safe math.log1p."""
+    return None if x is None else math.log1p(x)
+
+
+def _close():
+    """Close all cached connections (registered to run at interpreter exit)."""
+    flush_bet_events()
+    with _connections_lock:
+        for conn in list(_connections):
+            try:
+                conn.close()
+            except Exception:
+                pass
+        _connections.clear()
+
+
+atexit.register(_close)
+
+
+def _dumps(obj) -> str:
+    """Serialize to JSON text; int dict keys are written as strings."""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode()
+
+
+_loads = orjson.loads
+
+# Columns selected as "name [JSON]" are decoded by the driver on fetch (NULL stays None)
+sqlite3.register_converter('JSON', _loads)
+
+
+# Snapshot score/volume blobs: little-endian float64 indexed by UID, the same
+# precision the JSON columns kept
+_UID_ARRAY_DTYPE = np.dtype('<f8')
+_UID_VALUE_FORMAT = '<d'
+
+
+def _as_uid_array(values: Union[Dict[int, float], np.ndarray]) -> np.ndarray:
+    """Convert UID-indexed values (array or UID -> value dict) to a dense float64 array."""
+    if isinstance(values, np.ndarray):
+        return np.asarray(values, dtype=_UID_ARRAY_DTYPE)
+    arr = np.zeros(max(values) + 1 if values else 0, dtype=_UID_ARRAY_DTYPE)
+    if values:
+        arr[list(values.keys())] = list(values.values())
+    return arr
+
+
+def _unpack_uid_values(blob: Optional[bytes], fallback: Optional[dict]) -> Dict[str, float]:
+    """Decode a snapshot blob (or the already-decoded legacy JSON column) into a UID -> value dict."""
+    if blob is not None:
+        arr = np.frombuffer(blob, dtype=_UID_ARRAY_DTYPE)
+        return dict(zip(map(str, range(len(arr))), arr.tolist()))
+    return fallback or {}
+
+
+# ==================== SQL STATEMENTS ====================
+# Kept as constants so the per-connection statement cache reuses them.
+
+# Snapshots
+_SQL_INSERT_SNAPSHOT = '''
+    INSERT INTO snapshots (contract_address, block_number, total_miners, total_volume, scores_blob, volumes_blob)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+_SQL_GET_LATEST_SNAPSHOT = '''
+    SELECT block_number, timestamp, total_miners, total_volume,
+           scores_blob, volumes_blob,
+           scores_json AS "scores_json [JSON]", volumes_json AS "volumes_json [JSON]"
+    FROM snapshots WHERE contract_address = ? ORDER BY id DESC LIMIT 1
+'''
+_SQL_GET_SNAPSHOTS = '''
+    SELECT block_number, timestamp, total_miners, total_volume
+    FROM snapshots WHERE contract_address = ? ORDER BY id DESC LIMIT ?
+'''
+_SQL_GET_SNAPSHOT_BY_BLOCK = '''
+    SELECT block_number, timestamp, total_miners, total_volume,
+           scores_blob, volumes_blob,
+           scores_json AS "scores_json [JSON]", volumes_json AS "volumes_json [JSON]"
+    FROM snapshots WHERE contract_address = ? AND block_number = ?
+'''
+# Single-UID lookups: one element sliced from the blob, or json_extract for legacy rows
+_SQL_GET_SNAPSHOT_SCORE = '''
+    SELECT substr(scores_blob, ? * 8 + 1, 8), json_extract(scores_json, '$."' || ? || '"')
+    FROM snapshots WHERE contract_address = ? AND block_number = ?
+'''
+_SQL_GET_SNAPSHOT_VOLUME = '''
+    SELECT substr(volumes_blob, ? * 8 + 1, 8), json_extract(volumes_json, '$."' || ? || '"')
+    FROM snapshots WHERE contract_address = ? AND block_number = ?
+'''
+
+# Miner data
+_SQL_UPSERT_MINER_DATA = '''
+    INSERT INTO miner_data
+    (contract_address, uid, hotkey, coldkey, evm_address, daily_volumes_json, weighted_volume, score, last_updated)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(contract_address, uid) DO UPDATE SET
+        hotkey = excluded.hotkey,
+        coldkey = excluded.coldkey,
+        evm_address = excluded.evm_address,
+        daily_volumes_json = excluded.daily_volumes_json,
+        weighted_volume = excluded.weighted_volume,
+        score = excluded.score,
+        last_updated = CURRENT_TIMESTAMP
+'''
+_SQL_GET_MINER_DATA = '''
+    SELECT uid, hotkey, coldkey, evm_address, COALESCE(NULLIF(NULLIF(daily_volumes_json, 'null'), ''), '[]') AS "daily_volumes [JSON]", weighted_volume, score, last_updated
+    FROM miner_data WHERE contract_address = ? AND uid = ?
+'''
+_SQL_GET_ALL_MINER_DATA = '''
+    SELECT uid, hotkey, coldkey, evm_address, COALESCE(NULLIF(NULLIF(daily_volumes_json, 'null'), ''), '[]') AS "daily_volumes [JSON]", weighted_volume, score, last_updated
+    FROM miner_data WHERE contract_address = ? ORDER BY score DESC
+'''
+
+# Bet events
+_SQL_INSERT_BET_EVENT = '''
+    INSERT OR IGNORE INTO bet_events
+    (contract_address, evm_address, game_id, amount, side, block_number, timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+_SQL_GET_CACHED_BET_EVENTS = '''
+    SELECT game_id, amount, side, block_number, timestamp
+    FROM bet_events
+    WHERE contract_address = ? AND evm_address = ? AND timestamp >= ?
+    ORDER BY timestamp DESC
+'''
+_SQL_GET_CACHED_BET_EVENTS_WITH_ARCHIVE = '''
+    SELECT game_id, amount, side, block_number, timestamp
+    FROM bet_events
+    WHERE contract_address = ? AND evm_address = ? AND timestamp >= ?
+    UNION ALL
+    SELECT game_id, amount, side, block_number, timestamp
+    FROM bet_events_archive
+    WHERE contract_address = ? AND evm_address = ? AND timestamp >= ?
+    ORDER BY timestamp DESC
+'''
+_SQL_ARCHIVE_BET_EVENTS = '''
+    INSERT OR IGNORE INTO bet_events_archive
+    (contract_address, evm_address, game_id, amount, side, block_number, timestamp)
+    SELECT contract_address, evm_address, game_id, amount, side, block_number, timestamp
+    FROM bet_events WHERE timestamp < ? AND timestamp >= ?
+'''
+_SQL_DELETE_HOT_BET_EVENTS_BEFORE = 'DELETE FROM bet_events WHERE timestamp < ?'
+# DELETE ... LIMIT needs SQLITE_ENABLE_UPDATE_DELETE_LIMIT, so bound the batch via rowid
+_SQL_DELETE_OLD_ARCHIVED_BET_EVENTS = '''
+    DELETE FROM bet_events_archive WHERE rowid IN (
+        SELECT rowid FROM bet_events_archive WHERE timestamp < ? LIMIT ?
+    )
+'''
+_SQL_GET_ARCHIVE_BOUNDARY = 'SELECT MAX(timestamp) FROM bet_events_archive'
+_SQL_VOLUME_ROWS = '''
+    SELECT evm_address, amount FROM {table}
+    WHERE contract_address = ? AND timestamp >= ? AND evm_address IN ({keys})
+'''
+_SQL_VOLUME_SUM_BY_ADDRESS = 'SELECT evm_address, SUM({value}) FROM ({rows}) GROUP BY evm_address'
+_SQL_VALUE_AMOUNT = 'amount'
+_SQL_VALUE_LOG1P_AMOUNT = 'log1p(amount)'
+
+# Temporary key table used instead of an IN (?, ...) list for large batches
+_SQL_CREATE_TEMP_KEYS = 'CREATE TEMP TABLE IF NOT EXISTS _query_keys (key TEXT PRIMARY KEY)'
+_SQL_CLEAR_TEMP_KEYS = 'DELETE FROM temp._query_keys'
+_SQL_INSERT_TEMP_KEY = 'INSERT OR IGNORE INTO temp._query_keys (key) VALUES (?)'
+_SQL_SELECT_TEMP_KEYS = 'SELECT key FROM temp._query_keys'
+
+# Wallet mappings
+_SQL_UPSERT_WALLET_MAPPING = '''
+    INSERT INTO wallet_mappings
+    (coldkey, evm_address, signature, message, timestamp, verified_at)
+    VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ON CONFLICT(coldkey) DO UPDATE SET
+        evm_address = excluded.evm_address,
+        signature = excluded.signature,
+        message = excluded.message,
+        timestamp = excluded.timestamp,
+        verified_at = CURRENT_TIMESTAMP
+'''
+_SQL_GET_WALLET_MAPPING = '''
+    SELECT coldkey, evm_address, signature, message, timestamp, verified_at
+    FROM wallet_mappings WHERE coldkey = ?
+'''
+_SQL_GET_EVM_ADDRESS_FOR_COLDKEY = 'SELECT evm_address FROM wallet_mappings WHERE coldkey = ?'
+_SQL_GET_EVM_ADDRESSES_FOR_COLDKEYS = 'SELECT coldkey, evm_address FROM wallet_mappings WHERE coldkey IN ({keys})'
+_SQL_GET_ALL_WALLET_MAPPINGS = '''
+    SELECT coldkey, evm_address, timestamp, verified_at
+    FROM wallet_mappings ORDER BY verified_at DESC
+'''
+_SQL_DELETE_WALLET_MAPPING = 'DELETE FROM wallet_mappings WHERE coldkey = ?'
+
+# Contract data cleanup and stats
+_SQL_DELETE_BET_EVENTS_NOT_CONTRACT = 'DELETE FROM bet_events WHERE contract_address != ?'
+_SQL_DELETE_ARCHIVED_BET_EVENTS_NOT_CONTRACT = 'DELETE FROM bet_events_archive WHERE contract_address != ?'
+_SQL_DELETE_MINER_DATA_NOT_CONTRACT = 'DELETE FROM miner_data WHERE contract_address != ?'
+_SQL_DELETE_SNAPSHOTS_NOT_CONTRACT = '''
+    DELETE FROM snapshots WHERE contract_address != ? AND contract_address IS NOT NULL
+'''
+_SQL_DELETE_BET_EVENTS_FOR_CONTRACT = 'DELETE FROM bet_events WHERE contract_address = ?'
+_SQL_DELETE_ARCHIVED_BET_EVENTS_FOR_CONTRACT = 'DELETE FROM bet_events_archive WHERE contract_address = ?'
+_SQL_DELETE_MINER_DATA_FOR_CONTRACT = 'DELETE FROM miner_data WHERE contract_address = ?'
+_SQL_DELETE_SNAPSHOTS_FOR_CONTRACT = 'DELETE FROM snapshots WHERE contract_address = ?'
+_SQL_BET_EVENT_STATS = '''
+    SELECT contract_address, COUNT(*) as count, SUM(amount) as total_amount
+    FROM (
+        SELECT contract_address, amount FROM bet_events
+        UNION ALL
+        SELECT contract_address, amount FROM bet_events_archive
+    ) GROUP BY contract_address
+'''
+_SQL_MINER_DATA_STATS = '''
+    SELECT contract_address, COUNT(*) as count
+    FROM miner_data GROUP BY contract_address
+'''
+_SQL_SNAPSHOT_STATS = '''
+    SELECT contract_address, COUNT(*) as count
+    FROM snapshots GROUP BY contract_address
+'''
+
+# Startup prewarm: walk the b-trees the hot reads use. Bet event reads are
+# covering-index only; SUM(amount) forces a scan of that index, since a bare
+# COUNT(*) ignores INDEXED BY and counts the smallest index instead.
+_SQL_PREWARM = (
+    'SELECT SUM(amount) FROM bet_events INDEXED BY idx_bet_events_addr_ts',
+    'SELECT SUM(amount) FROM bet_events_archive INDEXED BY idx_bet_events_archive_addr_ts',
+    'SELECT COUNT(*) FROM miner_data NOT INDEXED',
+    'SELECT COUNT(*) FROM wallet_mappings NOT INDEXED',
+)
 
 
 def init_db():
@@ -35,6 +311,13 @@ def init_db():
         bt.logging.info("Migrating snapshots table: adding contract_address column")
         cursor.execute('ALTER TABLE snapshots ADD COLUMN contract_address TEXT')
     
+    if 'scores_blob' not in snapshot_columns and len(snapshot_columns) > 0:
+        # Old table stores scores/volumes as JSON only - add blob columns
+        # (old rows keep their JSON and are still readable)
+        bt.logging.info("Migrating snapshots table: adding scores_blob/volumes_blob columns")
+        cursor.execute('ALTER TABLE snapshots ADD COLUMN scores_blob BLOB')
+        cursor.execute('ALTER TABLE snapshots ADD COLUMN volumes_blob BLOB')
+    
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS snapshots (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -44,7 +327,9 @@ def init_db():
             total_miners INTEGER,
             total_volume REAL,
             scores_json TEXT,
-            volumes_json TEXT
+            volumes_json TEXT,
+            scores_blob BLOB,
+            volumes_blob BLOB
         )
     ''')
     
@@ -99,14 +384,37 @@ def init_db():
         )
     ''')
     
-    # Index for faster queries
+    # Covering index for get_cached_bet_events: range scan on timestamp per
+    # address with no table lookups or sort. Supersedes the old
+    # (contract_address, evm_address) index, which is a prefix of it.
+    cursor.execute('DROP INDEX IF EXISTS idx_bet_events_contract_address')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_bet_events_addr_ts 
+        ON bet_events(contract_address, evm_address, timestamp DESC, game_id, amount, side, block_number)
+    ''')
+    # No standalone timestamp index: only the periodic cleanup filters on
+    # timestamp alone, and a scan there is cheaper than maintaining another
+    # B-tree on every insert
+    cursor.execute('DROP INDEX IF EXISTS idx_bet_events_timestamp')
+    
+    # Archive for bet events older than the hot window - same layout, keeps
+    # the hot bet_events table (and its indexes) small
     cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_bet_events_contract_address 
-        ON bet_events(contract_address, evm_address)
+        CREATE TABLE IF NOT EXISTS bet_events_archive (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            contract_address TEXT NOT NULL,
+            evm_address TEXT NOT NULL,
+            game_id INTEGER,
+            amount REAL,
+            side INTEGER,
+            block_number INTEGER,
+            timestamp INTEGER,
+            UNIQUE(contract_address, evm_address, game_id, block_number, side)
+        )
     ''')
     cursor.execute('''
-        CREATE INDEX IF NOT EXISTS idx_bet_events_timestamp 
-        ON bet_events(timestamp)
+        CREATE INDEX IF NOT EXISTS idx_bet_events_archive_addr_ts 
+        ON bet_events_archive(contract_address, evm_address, timestamp DESC, game_id, amount, side, block_number)
     ''')
     
     # Wallet mappings table - coldkey to EVM address mappings
@@ -132,14 +440,30 @@ def init_db():
     ''')
     
     conn.commit()
-    conn.close()
+    
+    _get_archive_boundary(conn, reload=True)
+    
     bt.logging.info("Database initialized successfully")
 
 
+def prewarm_db():
+    """
+    Read the bet event covering indexes and the miner/wallet tables once at startup.
+    
+    Call after init_db(). The pages land in the OS page cache (shared through
+    mmap), so later reads on any connection avoid cold disk reads; SQLite's own
+    page cache is per connection and only warmed for the calling thread.
+    """
+    conn = _get_connection()
+    for sql in _SQL_PREWARM:
+        conn.execute(sql).fetchone()
+    bt.logging.debug("Database page cache prewarmed")
+
+
 def save_snapshot(
     block_number: int, 
-    scores: Dict[int, float], 
-    volumes: Dict[int, float],
+    scores: Union[Dict[int, float], np.ndarray], 
+    volumes: Union[Dict[int, float], np.ndarray],
     miner_details: Optional[Dict[int, dict]] = None,
     contract_address: str = None
 ):
@@ -148,62 +472,54 @@ def save_snapshot(
     
     Args:
         block_number: Current block number
-        scores: Dict of UID -> score
-        volumes: Dict of UID -> weighted volume
+        scores: Array indexed by UID, or dict of UID -> score
+        volumes: Array indexed by UID, or dict of UID -> weighted volume
         miner_details: Optional dict with additional miner info
         contract_address: Contract address (defaults to current)
     """
-    conn = _get_connection()
-    cursor = conn.cursor()
-    
     # Use current contract address if not specified
     contract_addr = contract_address or CASINOTAO_CONTRACT_ADDRESS
     
-    # Convert int keys to strings for JSON
-    scores_json = json.dumps({str(k): v for k, v in scores.items()})
-    volumes_json = json.dumps({str(k): v for k, v in volumes.items()})
-    
-    cursor.execute('''
-        INSERT INTO snapshots (contract_address, block_number, total_miners, total_volume, scores_json, volumes_json)
-        VALUES (?, ?, ?, ?, ?, ?)
-    ''', (
-        contract_addr,
-        block_number,
-        len([s for s in scores.values() if s > 0]),
-        sum(volumes.values()),
-        scores_json,
-        volumes_json
-    ))
+    # Summaries are reduced over the input values at float64
+    scores_values = list(scores.values()) if isinstance(scores, dict) else scores
+    volumes_values = list(volumes.values()) if isinstance(volumes, dict) else volumes
+    total_miners = int(np.count_nonzero(np.asarray(scores_values, dtype=np.float64) > 0))
+    total_volume = float(np.asarray(volumes_values, dtype=np.float64).sum())
+    
+    # Dense arrays indexed by UID
+    scores_arr = _as_uid_array(scores)
+    volumes_arr = _as_uid_array(volumes)
+    
+    with _get_connection() as conn:
+        conn.execute(_SQL_INSERT_SNAPSHOT, (
+            contract_addr,
+            block_number,
+            total_miners,
+            total_volume,
+            scores_arr.tobytes(),
+            volumes_arr.tobytes()
+        ))
     
-    conn.commit()
-    conn.close()
     bt.logging.info(f"Snapshot saved at block {block_number} for contract {contract_addr[:10]}...")
 
 
 def get_latest_snapshot(contract_address: str = None) -> Optional[dict]:
     """Get the most recent snapshot for the current contract."""
     conn = _get_connection()
-    cursor = conn.cursor()
     
     # Use current contract address if not specified
     contract_addr = contract_address or CASINOTAO_CONTRACT_ADDRESS
     
-    cursor.execute('''
-        SELECT block_number, timestamp, total_miners, total_volume, scores_json, volumes_json
-        FROM snapshots WHERE contract_address = ? ORDER BY id DESC LIMIT 1
-    ''', (contract_addr,))
-    
-    row = cursor.fetchone()
-    conn.close()
+    row = conn.execute(_SQL_GET_LATEST_SNAPSHOT, (contract_addr,)).fetchone()
     
     if row:
         return {
-            'block_number': row[0],
-            'timestamp': row[1],
-            'total_miners': row[2],
-            'total_volume': row[3],
-            'scores': json.loads(row[4]) if row[4] else {},
-            'volumes': json.loads(row[5]) if row[5] else {}
+            'block_number': row['block_number'],
+            'timestamp': row['timestamp'],
+            'total_miners': row['total_miners'],
+            'total_volume': row['total_volume'],
+            'scores': _unpack_uid_values(row['scores_blob'], row['scores_json']),
+            'volumes': _unpack_uid_values(row['volumes_blob'], row['volumes_json'])
         }
     return None
 
@@ -211,58 +527,88 @@ def get_latest_snapshot(contract_address: str = None) -> Optional[dict]:
 def get_snapshots(limit: int = 100, contract_address: str = None) -> List[dict]:
     """Get recent snapshots (summary only) for the current contract."""
     conn = _get_connection()
-    cursor = conn.cursor()
     
     # Use current contract address if not specified
     contract_addr = contract_address or CASINOTAO_CONTRACT_ADDRESS
     
-    cursor.execute('''
-        SELECT block_number, timestamp, total_miners, total_volume
-        FROM snapshots WHERE contract_address = ? ORDER BY id DESC LIMIT ?
-    ''', (contract_addr, limit))
-    
-    rows = cursor.fetchall()
-    conn.close()
-    
-    return [
-        {
-            'block_number': r[0],
-            'timestamp': r[1],
-            'total_miners': r[2],
-            'total_volume': r[3]
-        }
-        for r in rows
-    ]
+    rows = conn.execute(_SQL_GET_SNAPSHOTS, (contract_addr, limit)).fetchall()
+    
+    return [dict(r) for r in rows]
 
 
 def get_snapshot_by_block(block_number: int, contract_address: str = None) -> Optional[dict]:
     """Get a specific snapshot by block number for the current contract."""
     conn = _get_connection()
-    cursor = conn.cursor()
     
     # Use current contract address if not specified
     contract_addr = contract_address or CASINOTAO_CONTRACT_ADDRESS
     
-    cursor.execute('''
-        SELECT block_number, timestamp, total_miners, total_volume, scores_json, volumes_json
-        FROM snapshots WHERE contract_address = ? AND block_number = ?
-    ''', (contract_addr, block_number))
-    
-    row = cursor.fetchone()
-    conn.close()
+    row = conn.execute(_SQL_GET_SNAPSHOT_BY_BLOCK, (contract_addr, block_number)).fetchone()
     
     if row:
         return {
-            'block_number': row[0],
-            'timestamp': row[1],
-            'total_miners': row[2],
-            'total_volume': row[3],
-            'scores': json.loads(row[4]) if row[4] else {},
-            'volumes': json.loads(row[5]) if row[5] else {}
+            'block_number': row['block_number'],
+            'timestamp': row['timestamp'],
+            'total_miners': row['total_miners'],
+            'total_volume': row['total_volume'],
+            'scores': _unpack_uid_values(row['scores_blob'], row['scores_json']),
+            'volumes': _unpack_uid_values(row['volumes_blob'], row['volumes_json'])
         }
     return None
 
 
+def _get_snapshot_value(sql: str, block_number: int, uid: int, contract_address: str = None) -> Optional[float]:
+    """Read one UID's value from a snapshot without decoding the whole snapshot."""
+    # Use current contract address if not specified
+    contract_addr = contract_address or CASINOTAO_CONTRACT_ADDRESS
+    
+    # substr() counts a negative start from the end of the blob
+    if uid < 0:
+        return None
+    
+    row = _get_connection().execute(sql, (uid, uid, contract_addr, block_number)).fetchone()
+    
+    if not row:
+        return None
+    if row[0] is not None:
+        return struct.unpack(_UID_VALUE_FORMAT, row[0])[0] if len(row[0]) == _UID_ARRAY_DTYPE.itemsize else None
+    return row[1]
+
+
+def get_snapshot_score(block_number: int, uid: int, contract_address: str = None) -> Optional[float]:
+    """
+    Get a single miner's score from the snapshot at a block.
+    
+    Args:
+        block_number: Snapshot block number
+        uid: Miner UID
+        contract_address: Contract address (defaults to current)
+        
+    Returns:
+        Score, or None if there is no snapshot or the UID is past the
+        end of it. Snapshots are dense by UID, so a UID missing from the
+        saved input reads as 0.0 (legacy JSON snapshots return None).
+    """
+    return _get_snapshot_value(_SQL_GET_SNAPSHOT_SCORE, block_number, uid, contract_address)
+
+
+def get_snapshot_volume(block_number: int, uid: int, contract_address: str = None) -> Optional[float]:
+    """
+    Get a single miner's weighted volume from the snapshot at a block.
+    
+    Args:
+        block_number: Snapshot block number
+        uid: Miner UID
+        contract_address: Contract address (defaults to current)
+        
+    Returns:
+        Weighted volume, or None if there is no snapshot or the UID is past the
+        end of it. Snapshots are dense by UID, so a UID missing from the
+        saved input reads as 0.0 (legacy JSON snapshots return None).
+    """
+    return _get_snapshot_value(_SQL_GET_SNAPSHOT_VOLUME, block_number, uid, contract_address)
+
+
 def update_miner_data(
     uid: int,
     hotkey: str,
@@ -274,102 +620,97 @@ def update_miner_data(
     contract_address: str = None
 ):
     """Update or insert miner data for the current contract."""
-    conn = _get_connection()
-    cursor = conn.cursor()
-    
     # Use current contract address if not specified
     contract_addr = contract_address or CASINOTAO_CONTRACT_ADDRESS
     
-    # Check if record exists for this contract + uid
-    cursor.execute(
-        'SELECT id FROM miner_data WHERE contract_address = ? AND uid = ?',
-        (contract_addr, uid)
-    )
-    existing = cursor.fetchone()
-    
-    if existing:
-        cursor.execute('''
-            UPDATE miner_data 
-            SET hotkey = ?, coldkey = ?, evm_address = ?, daily_volumes_json = ?, 
-                weighted_volume = ?, score = ?, last_updated = CURRENT_TIMESTAMP
-            WHERE contract_address = ? AND uid = ?
-        ''', (
-            hotkey, coldkey, evm_address, json.dumps(daily_volumes),
-            weighted_volume, score, contract_addr, uid
-        ))
-    else:
-        cursor.execute('''
-            INSERT INTO miner_data 
-            (contract_address, uid, hotkey, coldkey, evm_address, daily_volumes_json, weighted_volume, score, last_updated)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-        ''', (
+    with _get_connection() as conn:
+        conn.execute(_SQL_UPSERT_MINER_DATA, (
             contract_addr, uid, hotkey, coldkey, evm_address,
-            json.dumps(daily_volumes), weighted_volume, score
+            _dumps(daily_volumes), weighted_volume, score
         ))
-    
-    conn.commit()
-    conn.close()
 
 
 def get_miner_data(uid: int, contract_address: str = None) -> Optional[dict]:
     """Get miner data by UID for the current contract."""
     conn = _get_connection()
-    cursor = conn.cursor()
     
     # Use current contract address if not specified
     contract_addr = contract_address or CASINOTAO_CONTRACT_ADDRESS
     
-    cursor.execute('''
-        SELECT uid, hotkey, coldkey, evm_address, daily_volumes_json, weighted_volume, score, last_updated
-        FROM miner_data WHERE contract_address = ? AND uid = ?
-    ''', (contract_addr, uid))
+    row = conn.execute(_SQL_GET_MINER_DATA, (contract_addr, uid)).fetchone()
     
-    row = cursor.fetchone()
-    conn.close()
+    return dict(row) if row else None
+
+
+def iter_all_miner_data(contract_address: str = None) -> Iterator[dict]:
+    """
+    Iterate over all miner data for the current contract, highest score first.
     
-    if row:
-        return {
-            'uid': row[0],
-            'hotkey': row[1],
-            'coldkey': row[2],
-            'evm_address': row[3],
-            'daily_volumes': json.loads(row[4]) if row[4] else [],
-            'weighted_volume': row[5],
-            'score': row[6],
-            'last_updated': row[7]
-        }
-    return None
+    Rows are read from the cursor as they are consumed, so the full result
+    set is never held in memory at once.
+    """
+    conn = _get_connection()
+    
+    # Use current contract address if not specified
+    contract_addr = contract_address or CASINOTAO_CONTRACT_ADDRESS
+    
+    for row in conn.execute(_SQL_GET_ALL_MINER_DATA, (contract_addr,)):
+        yield dict(row)
 
 
 def get_all_miner_data(contract_address: str = None) -> List[dict]:
     """Get all miner data for the current contract."""
+    return list(iter_all_miner_data(contract_address))
+
+
+def cache_bet_events_bulk(rows: List[tuple]) -> int:
+    """
+    Cache many bet events in a single transaction.
+    
+    Args:
+        rows: List of (contract_address, evm_address, game_id, amount, side,
+              block_number, timestamp) tuples; evm_address must be lowercase
+              
+    Returns:
+        Number of rows written (duplicates are ignored)
+    """
+    if not rows:
+        return 0
+    
     conn = _get_connection()
-    cursor = conn.cursor()
     
-    # Use current contract address if not specified
-    contract_addr = contract_address or CASINOTAO_CONTRACT_ADDRESS
+    try:
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            cursor = conn.executemany(_SQL_INSERT_BET_EVENT, rows)
+        return cursor.rowcount
+    except Exception as e:
+        bt.logging.warning(f"Error caching {len(rows)} bet events, batch dropped: {e}")
+        return 0
+
+
+# Pending single-event writes, flushed in bulk by size or age
+_BET_EVENT_FLUSH_SIZE = 500
+_BET_EVENT_FLUSH_INTERVAL = 5.0  # seconds
+_pending_bet_events = deque()
+_pending_lock = threading.Lock()
+_last_bet_event_flush = time.monotonic()
+
+
+def flush_bet_events() -> int:
+    """
+    Write any buffered bet events to the database.
     
-    cursor.execute('''
-        SELECT uid, hotkey, coldkey, evm_address, daily_volumes_json, weighted_volume, score, last_updated
-        FROM miner_data WHERE contract_address = ? ORDER BY score DESC
-    ''', (contract_addr,))
-    
-    rows = cursor.fetchall()
-    conn.close()
-    
-    return [
-        {
-            'uid': r[0],
-            'hotkey': r[1],
-            'coldkey': r[2],
-            'evm_address': r[3],
-            'daily_volumes': json.loads(r[4]) if r[4] else [],
-            'weighted_volume': r[5],
-            'score': r[6],
-            'last_updated': r[7]
-        }
-        for r in rows
-    ]
+    The lock is held until the write commits, so a reader in another thread
+    that flushes while a write is in flight waits for it instead of
+    querying before the events land.
+    """
+    global _last_bet_event_flush
+    with _pending_lock:
+        rows = list(_pending_bet_events)
+        _pending_bet_events.clear()
+        _last_bet_event_flush = time.monotonic()
+        return cache_bet_events_bulk(rows)
 
 
 def cache_bet_event(
@@ -381,72 +722,262 @@ def cache_bet_event(
     timestamp: int,
     contract_address: str = None
 ):
-    """Cache a bet event to avoid re-querying."""
-    conn = _get_connection()
-    cursor = conn.cursor()
+    """
+    Cache a bet event to avoid re-querying.
     
+    Events are buffered and written in batches: when the buffer reaches
+    _BET_EVENT_FLUSH_SIZE, on the first append after _BET_EVENT_FLUSH_INTERVAL
+    has passed, or when a reader, cleanup or interpreter exit flushes it.
+    Readers flush before querying, so events buffered before a read are
+    visible to it.
+    """
     # Use current contract address if not specified
     contract_addr = contract_address or CASINOTAO_CONTRACT_ADDRESS
     
-    try:
-        cursor.execute('''
-            INSERT OR IGNORE INTO bet_events 
-            (contract_address, evm_address, game_id, amount, side, block_number, timestamp)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (contract_addr, evm_address, game_id, amount, side, block_number, timestamp))
-        conn.commit()
-    except Exception as e:
-        bt.logging.debug(f"Error caching bet event: {e}")
-    finally:
-        conn.close()
+    with _pending_lock:
+        _pending_bet_events.append(
+            (contract_addr, evm_address.lower(), game_id, amount, side, block_number, timestamp)
+        )
+        should_flush = (
+            len(_pending_bet_events) >= _BET_EVENT_FLUSH_SIZE
+            or time.monotonic() - _last_bet_event_flush >= _BET_EVENT_FLUSH_INTERVAL
+        )
+    
+    if should_flush:
+        flush_bet_events()
+
+
+# Bet events newer than this many seconds stay in the hot bet_events table;
+# cleanup_old_events moves older ones to bet_events_archive. Sized to cover
+# ContractClient.get_bets_last_7_days (plus a day of slack) so the per-miner
+# lookups stay on the single hot-table index.
+_HOT_BET_EVENT_WINDOW = 8 * 86400
+
+# Every archived event is older than this timestamp (None = archive empty)
+_archive_boundary: Optional[int] = None
+_archive_boundary_loaded = False
+
+
+def _get_archive_boundary(conn: sqlite3.Connection, reload: bool = False) -> Optional[int]:
+    """Get the archive boundary, reading it from the database on first use."""
+    global _archive_boundary, _archive_boundary_loaded
+    if reload or not _archive_boundary_loaded:
+        row = conn.execute(_SQL_GET_ARCHIVE_BOUNDARY).fetchone()
+        _archive_boundary = row[0] + 1 if row and row[0] is not None else None
+        _archive_boundary_loaded = True
+    return _archive_boundary
+
+
+def _cached_bet_events_query(
+    conn: sqlite3.Connection,
+    evm_address: str,
+    since_timestamp: int,
+    contract_addr: str
+) -> tuple:
+    """Pick the hot-only or hot+archive query for a cached bet event lookup."""
+    # Addresses are cached lowercase; normalize so lookups hit the index exactly
+    params = (contract_addr, evm_address.lower(), since_timestamp)
+    archive_boundary = _get_archive_boundary(conn)
+    if archive_boundary is None or since_timestamp >= archive_boundary:
+        return _SQL_GET_CACHED_BET_EVENTS, params
+    return _SQL_GET_CACHED_BET_EVENTS_WITH_ARCHIVE, params + params
 
 
 def get_cached_bet_events(evm_address: str, since_timestamp: int, contract_address: str = None) -> List[dict]:
     """Get cached bet events for an address since a given timestamp.
     
     Only returns events from the specified contract (defaults to current contract).
+    The archive table is only queried when the window reaches past the hot table.
     """
+    flush_bet_events()
+    
     conn = _get_connection()
-    cursor = conn.cursor()
     
     # Use current contract address if not specified
     contract_addr = contract_address or CASINOTAO_CONTRACT_ADDRESS
     
-    cursor.execute('''
-        SELECT game_id, amount, side, block_number, timestamp
-        FROM bet_events 
-        WHERE contract_address = ? AND evm_address = ? AND timestamp >= ?
-        ORDER BY timestamp DESC
-    ''', (contract_addr, evm_address, since_timestamp))
-    
-    rows = cursor.fetchall()
-    conn.close()
-    
-    return [
-        {
-            'game_id': r[0],
-            'amount': r[1],
-            'side': r[2],
-            'block_number': r[3],
-            'timestamp': r[4]
-        }
-        for r in rows
-    ]
+    rows = conn.execute(*_cached_bet_events_query(conn, evm_address, since_timestamp, contract_addr)).fetchall()
+    
+    return [dict(r) for r in rows]
 
 
-def cleanup_old_events(days: int = 14):
-    """Remove bet events older than specified days."""
+# Column layout of get_cached_bet_events_np results
+BET_EVENT_DTYPE = np.dtype([
+    ('game_id', 'i8'),
+    ('amount', 'f8'),
+    ('side', 'i1'),
+    ('block_number', 'i8'),
+    ('timestamp', 'i8'),
+])
+
+
+def get_cached_bet_events_np(evm_address: str, since_timestamp: int, contract_address: str = None) -> np.ndarray:
+    """
+    Get cached bet events for an address as a structured array.
+    
+    Same query as get_cached_bet_events, but rows are written straight into
+    a BET_EVENT_DTYPE array so callers can use column reductions such as
+    events['amount'].sum() instead of walking a list of dicts.
+    
+    Args:
+        evm_address: EVM address to query
+        since_timestamp: Only include events at or after this Unix timestamp
+        contract_address: Contract address (defaults to current)
+        
+    Returns:
+        Structured array ordered by timestamp (newest first)
+    """
+    flush_bet_events()
+    
     conn = _get_connection()
     cursor = conn.cursor()
     
-    cutoff = int(datetime.utcnow().timestamp()) - (days * 86400)
+    # Use current contract address if not specified
+    contract_addr = contract_address or CASINOTAO_CONTRACT_ADDRESS
     
-    cursor.execute('DELETE FROM bet_events WHERE timestamp < ?', (cutoff,))
-    deleted = cursor.rowcount
+    # np.fromiter needs plain tuples
+    cursor.row_factory = None
+    cursor.execute(*_cached_bet_events_query(conn, evm_address, since_timestamp, contract_addr))
     
-    conn.commit()
-    conn.close()
+    return np.fromiter(cursor, dtype=BET_EVENT_DTYPE, count=-1)
+
+
+# Batches larger than this go through the _query_keys temp table
+_IN_LIST_LIMIT = 500
+
+
+def _key_filter(conn: sqlite3.Connection, keys: List[str]) -> tuple:
+    """
+    Build the right-hand side of an `IN (...)` filter for a batch of keys.
+    
+    Small batches use bound parameters; larger ones are loaded into a temp
+    table so the statement stays within SQLite's variable limit. Call inside
+    a transaction on `conn`.
+    
+    Returns:
+        Tuple of (sql fragment, params)
+    """
+    if len(keys) <= _IN_LIST_LIMIT:
+        return ','.join('?' * len(keys)), list(keys)
+    
+    conn.execute(_SQL_CREATE_TEMP_KEYS)
+    conn.execute(_SQL_CLEAR_TEMP_KEYS)
+    conn.executemany(_SQL_INSERT_TEMP_KEY, ((k,) for k in keys))
+    return _SQL_SELECT_TEMP_KEYS, []
+
+
+def _sum_by_address(
+    value_sql: str,
+    addresses: List[str],
+    since_timestamp: int,
+    contract_address: str = None
+) -> np.ndarray:
+    """Sum a per-event SQL expression over cached bet events, grouped by address."""
+    if not addresses:
+        return np.zeros(0, dtype=np.float64)
+    
+    flush_bet_events()
+    
+    # Use current contract address if not specified
+    contract_addr = contract_address or CASINOTAO_CONTRACT_ADDRESS
+    
+    keys = [a.lower() for a in addresses]
+    with _get_connection() as conn:
+        tables = ['bet_events']
+        archive_boundary = _get_archive_boundary(conn)
+        if archive_boundary is not None and since_timestamp < archive_boundary:
+            tables.append('bet_events_archive')
+        
+        key_sql, key_params = _key_filter(conn, keys)
+        sql = _SQL_VOLUME_SUM_BY_ADDRESS.format(value=value_sql, rows=' UNION ALL '.join(
+            _SQL_VOLUME_ROWS.format(table=table, keys=key_sql) for table in tables
+        ))
+        params = [contract_addr, since_timestamp, *key_params] * len(tables)
+        totals = {row[0]: row[1] for row in conn.execute(sql, params)}
+    
+    return np.fromiter((totals.get(k, 0.0) for k in keys), dtype=np.float64, count=len(keys))
+
+
+def get_volume_sum_by_address(
+    addresses: List[str],
+    since_timestamp: int,
+    contract_address: str = None
+) -> np.ndarray:
+    """
+    Get total cached bet volume per address since a given timestamp.
+    
+    The sum is computed by SQLite with a grouped aggregate over the bet event
+    index, so no per-event rows are materialized in Python.
+    
+    Args:
+        addresses: EVM addresses to total
+        since_timestamp: Only include events at or after this Unix timestamp
+        contract_address: Contract address (defaults to current)
+        
+    Returns:
+        Float array aligned with `addresses` (0.0 for addresses with no events)
+    """
+    return _sum_by_address(_SQL_VALUE_AMOUNT, addresses, since_timestamp, contract_address)
+
+
+def get_log1p_volume_sum_by_address(
+    addresses: List[str],
+    since_timestamp: int,
+    contract_address: str = None
+) -> np.ndarray:
+    """
+    Get the sum of log(1 + amount) over cached bet events per address.
+    
+    Dampens the weight of individual large bets; like get_volume_sum_by_address
+    the aggregate runs inside SQLite.
+    
+    Args:
+        addresses: EVM addresses to total
+        since_timestamp: Only include events at or after this Unix timestamp
+        contract_address: Contract address (defaults to current)
+        
+    Returns:
+        Float array aligned with `addresses` (0.0 for addresses with no events)
+    """
+    return _sum_by_address(_SQL_VALUE_LOG1P_AMOUNT, addresses, since_timestamp, contract_address)
+
+
+_CLEANUP_BATCH_SIZE = 10000
+
+
+def cleanup_old_events(days: int = 14):
+    """
+    Move bet events out of the hot table and remove events older than specified days.
+    
+    Events older than the hot window are moved to bet_events_archive in one
+    transaction; archived events older than `days` are deleted in batches so
+    a large purge never holds the write lock for long.
+    """
+    global _archive_boundary
+    flush_bet_events()
     
+    conn = _get_connection()
+    _get_archive_boundary(conn)
+    
+    now = int(time.time())
+    cutoff = now - (days * 86400)
+    hot_cutoff = max(now - _HOT_BET_EVENT_WINDOW, cutoff)
+    
+    with conn:
+        archived = conn.execute(_SQL_ARCHIVE_BET_EVENTS, (hot_cutoff, cutoff)).rowcount
+        conn.execute(_SQL_DELETE_HOT_BET_EVENTS_BEFORE, (hot_cutoff,))
+    
+    deleted = 0
+    while True:
+        with conn:
+            batch = conn.execute(_SQL_DELETE_OLD_ARCHIVED_BET_EVENTS, (cutoff, _CLEANUP_BATCH_SIZE)).rowcount
+        deleted += batch
+        if batch < _CLEANUP_BATCH_SIZE:
+            break
+    
+    if archived > 0:
+        _archive_boundary = max(_archive_boundary or 0, hot_cutoff)
+        bt.logging.info(f"Archived {archived} bet events")
     if deleted > 0:
         bt.logging.info(f"Cleaned up {deleted} old bet events")
 
@@ -473,29 +1004,20 @@ def save_wallet_mapping(
     Returns:
         True if saved successfully, False otherwise
     """
-    conn = _get_connection()
-    cursor = conn.cursor()
-    
     try:
-        cursor.execute('''
-            INSERT OR REPLACE INTO wallet_mappings 
-            (coldkey, evm_address, signature, message, timestamp, verified_at)
-            VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
-        ''', (
-            coldkey,
-            evm_address.lower(),  # Normalize EVM address to lowercase
-            signature,
-            message,
-            timestamp
-        ))
-        conn.commit()
+        with _get_connection() as conn:
+            conn.execute(_SQL_UPSERT_WALLET_MAPPING, (
+                coldkey,
+                evm_address.lower(),  # Normalize EVM address to lowercase
+                signature,
+                message,
+                timestamp
+            ))
         bt.logging.info(f"Wallet mapping saved: {coldkey[:10]}... -> {evm_address[:10]}...")
         return True
     except Exception as e:
         bt.logging.error(f"Failed to save wallet mapping: {e}")
         return False
-    finally:
-        conn.close()
 
 
 def get_wallet_mapping(coldkey: str) -> Optional[dict]:
@@ -509,26 +1031,10 @@ def get_wallet_mapping(coldkey: str) -> Optional[dict]:
         Dict with mapping info or None if not found
     """
     conn = _get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('''
-        SELECT coldkey, evm_address, signature, message, timestamp, verified_at
-        FROM wallet_mappings WHERE coldkey = ?
-    ''', (coldkey,))
     
-    row = cursor.fetchone()
-    conn.close()
+    row = conn.execute(_SQL_GET_WALLET_MAPPING, (coldkey,)).fetchone()
     
-    if row:
-        return {
-            'coldkey': row[0],
-            'evm_address': row[1],
-            'signature': row[2],
-            'message': row[3],
-            'timestamp': row[4],
-            'verified_at': row[5]
-        }
-    return None
+    return dict(row) if row else None
 
 
 def get_evm_address_for_coldkey(coldkey: str) -> Optional[str]:
@@ -541,32 +1047,36 @@ def get_evm_address_for_coldkey(coldkey: str) -> Optional[str]:
     Returns:
         EVM address or None if not mapped
     """
-    mapping = get_wallet_mapping(coldkey)
-    return mapping['evm_address'] if mapping else None
+    row = _get_connection().execute(_SQL_GET_EVM_ADDRESS_FOR_COLDKEY, (coldkey,)).fetchone()
+    return row[0] if row else None
+
+
+def get_evm_addresses_for_coldkeys(coldkeys: List[str]) -> Dict[str, str]:
+    """
+    Get the EVM addresses mapped to a batch of coldkeys in one query.
+    
+    Args:
+        coldkeys: Bittensor coldkeys (SS58 format)
+        
+    Returns:
+        Dict of coldkey -> EVM address; unmapped coldkeys are omitted
+    """
+    if not coldkeys:
+        return {}
+    
+    with _get_connection() as conn:
+        key_sql, key_params = _key_filter(conn, coldkeys)
+        rows = conn.execute(_SQL_GET_EVM_ADDRESSES_FOR_COLDKEYS.format(keys=key_sql), key_params)
+        return {row[0]: row[1] for row in rows}
 
 
 def get_all_wallet_mappings() -> List[dict]:
     """Get all wallet mappings."""
     conn = _get_connection()
-    cursor = conn.cursor()
     
-    cursor.execute('''
-        SELECT coldkey, evm_address, timestamp, verified_at
-        FROM wallet_mappings ORDER BY verified_at DESC
-    ''')
-    
-    rows = cursor.fetchall()
-    conn.close()
+    rows = conn.execute(_SQL_GET_ALL_WALLET_MAPPINGS).fetchall()
     
-    return [
-        {
-            'coldkey': r[0],
-            'evm_address': r[1],
-            'timestamp': r[2],
-            'verified_at': r[3]
-        }
-        for r in rows
-    ]
+    return [dict(r) for r in rows]
 
 
 def delete_wallet_mapping(coldkey: str) -> bool:
@@ -579,14 +1089,8 @@ def delete_wallet_mapping(coldkey: str) -> bool:
     Returns:
         True if deleted, False if not found
     """
-    conn = _get_connection()
-    cursor = conn.cursor()
-    
-    cursor.execute('DELETE FROM wallet_mappings WHERE coldkey = ?', (coldkey,))
-    deleted = cursor.rowcount > 0
-    
-    conn.commit()
-    conn.close()
+    with _get_connection() as conn:
+        deleted = conn.execute(_SQL_DELETE_WALLET_MAPPING, (coldkey,)).rowcount > 0
     
     return deleted
 
@@ -602,45 +1106,41 @@ def clear_contract_data(contract_address: str = None, clear_all_except_current:
                           clears all data NOT from current contract)
         clear_all_except_current: If True, clears data from all contracts except current
     """
-    conn = _get_connection()
-    cursor = conn.cursor()
-    
-    if clear_all_except_current:
-        # Clear data from all contracts except the current one
-        current_contract = CASINOTAO_CONTRACT_ADDRESS
-        
-        cursor.execute('DELETE FROM bet_events WHERE contract_address != ?', (current_contract,))
-        bet_deleted = cursor.rowcount
-        
-        cursor.execute('DELETE FROM miner_data WHERE contract_address != ?', (current_contract,))
-        miner_deleted = cursor.rowcount
-        
-        cursor.execute('DELETE FROM snapshots WHERE contract_address != ? AND contract_address IS NOT NULL', 
-                      (current_contract,))
-        snapshot_deleted = cursor.rowcount
-        
-        bt.logging.info(
-            f"Cleared old contract data: {bet_deleted} bet events, "
-            f"{miner_deleted} miner records, {snapshot_deleted} snapshots"
-        )
-    elif contract_address:
-        # Clear data for specific contract
-        cursor.execute('DELETE FROM bet_events WHERE contract_address = ?', (contract_address,))
-        bet_deleted = cursor.rowcount
-        
-        cursor.execute('DELETE FROM miner_data WHERE contract_address = ?', (contract_address,))
-        miner_deleted = cursor.rowcount
-        
-        cursor.execute('DELETE FROM snapshots WHERE contract_address = ?', (contract_address,))
-        snapshot_deleted = cursor.rowcount
-        
-        bt.logging.info(
-            f"Cleared data for contract {contract_address[:10]}...: "
-            f"{bet_deleted} bet events, {miner_deleted} miner records, {snapshot_deleted} snapshots"
-        )
-    
-    conn.commit()
-    conn.close()
+    flush_bet_events()
+    
+    with _get_connection() as conn:
+        if clear_all_except_current:
+            # Clear data from all contracts except the current one
+            current_contract = CASINOTAO_CONTRACT_ADDRESS
+            
+            bet_deleted = conn.execute(_SQL_DELETE_BET_EVENTS_NOT_CONTRACT, (current_contract,)).rowcount
+            bet_deleted += conn.execute(
+                _SQL_DELETE_ARCHIVED_BET_EVENTS_NOT_CONTRACT, (current_contract,)
+            ).rowcount
+            
+            miner_deleted = conn.execute(_SQL_DELETE_MINER_DATA_NOT_CONTRACT, (current_contract,)).rowcount
+            
+            snapshot_deleted = conn.execute(_SQL_DELETE_SNAPSHOTS_NOT_CONTRACT, (current_contract,)).rowcount
+            
+            bt.logging.info(
+                f"Cleared old contract data: {bet_deleted} bet events, "
+                f"{miner_deleted} miner records, {snapshot_deleted} snapshots"
+            )
+        elif contract_address:
+            # Clear data for specific contract
+            bet_deleted = conn.execute(_SQL_DELETE_BET_EVENTS_FOR_CONTRACT, (contract_address,)).rowcount
+            bet_deleted += conn.execute(
+                _SQL_DELETE_ARCHIVED_BET_EVENTS_FOR_CONTRACT, (contract_address,)
+            ).rowcount
+            
+            miner_deleted = conn.execute(_SQL_DELETE_MINER_DATA_FOR_CONTRACT, (contract_address,)).rowcount
+            
+            snapshot_deleted = conn.execute(_SQL_DELETE_SNAPSHOTS_FOR_CONTRACT, (contract_address,)).rowcount
+            
+            bt.logging.info(
+                f"Cleared data for contract {contract_address[:10]}...: "
+                f"{bet_deleted} bet events, {miner_deleted} miner records, {snapshot_deleted} snapshots"
+            )
 
 
 def get_contract_stats() -> Dict[str, dict]:
@@ -650,17 +1150,14 @@ def get_contract_stats() -> Dict[str, dict]:
     Returns:
         Dict mapping contract_address -> stats dict
     """
+    flush_bet_events()
+    
     conn = _get_connection()
-    cursor = conn.cursor()
     
     stats = {}
     
     # Bet events by contract
-    cursor.execute('''
-        SELECT contract_address, COUNT(*) as count, SUM(amount) as total_amount
-        FROM bet_events GROUP BY contract_address
-    ''')
-    for row in cursor.fetchall():
+    for row in conn.execute(_SQL_BET_EVENT_STATS):
         contract = row[0] or 'unknown'
         stats[contract] = {
             'bet_events': row[1],
@@ -668,26 +1165,17 @@ def get_contract_stats() -> Dict[str, dict]:
         }
     
     # Miner data by contract
-    cursor.execute('''
-        SELECT contract_address, COUNT(*) as count
-        FROM miner_data GROUP BY contract_address
-    ''')
-    for row in cursor.fetchall():
+    for row in conn.execute(_SQL_MINER_DATA_STATS):
         contract = row[0] or 'unknown'
         if contract not in stats:
             stats[contract] = {}
         stats[contract]['miner_records'] = row[1]
     
     # Snapshots by contract
-    cursor.execute('''
-        SELECT contract_address, COUNT(*) as count
-        FROM snapshots GROUP BY contract_address
-    ''')
-    for row in cursor.fetchall():
+    for row in conn.execute(_SQL_SNAPSHOT_STATS):
         contract = row[0] or 'unknown'
         if contract not in stats:
             stats[contract] = {}
         stats[contract]['snapshots'] = row[1]
     
-    conn.close()
     return stats
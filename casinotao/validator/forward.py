@@ -23,13 +23,13 @@ and updates miner scores based on time-decayed activity.
 """
 
 import time
-from typing import Dict, Optional
+from typing import Dict, List
 import numpy as np
 import bittensor as bt
 
 from casinotao.core.const import VOLUME_CHECK_INTERVAL
 from casinotao.validator.reward import calculate_volume_rewards
-from casinotao.validator.database import update_miner_data, cleanup_old_events, get_evm_address_for_coldkey
+from casinotao.validator.database import update_miner_data, cleanup_old_events, get_evm_addresses_for_coldkeys
 
 # Import contract client with error handling
 try:
@@ -44,28 +44,27 @@ except ImportError as e:
     bt.logging.warning(f"Contract module not available: {e}")
 
 
-def _get_miner_evm_address(coldkey: str) -> Optional[str]:
+def _get_miner_evm_addresses(coldkeys: List[str]) -> Dict[str, str]:
     """
-    Get the EVM address for a miner's coldkey.
+    Get the EVM addresses for a batch of miner coldkeys.
     
     This queries the database for wallet mappings that were registered
     via the POST /api/wallet-mapping endpoint. Miners use the frontend UI
     to sign a message with their coldkey and link it to their EVM address.
     
     Args:
-        coldkey: Bittensor coldkey (SS58 format)
+        coldkeys: Bittensor coldkeys (SS58 format)
         
     Returns:
-        EVM address or None if not mapped
+        Dict of coldkey -> EVM address for coldkeys that are mapped
     """
     try:
-        evm_address = get_evm_address_for_coldkey(coldkey)
-        if evm_address:
-            bt.logging.debug(f"Found EVM mapping for {coldkey[:10]}...: {evm_address[:10]}...")
-        return evm_address
+        evm_addresses = get_evm_addresses_for_coldkeys(coldkeys)
+        bt.logging.debug(f"Found EVM mappings for {len(evm_addresses)}/{len(coldkeys)} coldkeys")
+        return evm_addresses
     except Exception as e:
-        bt.logging.warning(f"Error getting EVM address for {coldkey[:10]}...: {e}")
-        return None
+        bt.logging.warning(f"Error getting EVM addresses for {len(coldkeys)} coldkeys: {e}")
+        return {}
 
 
 async def forward(self):
@@ -114,12 +113,19 @@ async def forward(self):
     
     bt.logging.info(f"Querying volumes for {self.metagraph.n} miners...")
     
+    # Resolve EVM addresses for all uncached miners in one query
+    evm_mappings = _get_miner_evm_addresses(list({
+        self.metagraph.coldkeys[uid]
+        for uid in range(self.metagraph.n)
+        if uid not in self.miner_evm_addresses
+    }))
+    
     for uid in range(self.metagraph.n):
         coldkey = self.metagraph.coldkeys[uid]
         hotkey = self.metagraph.hotkeys[uid]
         
         # Get EVM address for this miner
-        evm_address = self.miner_evm_addresses.get(uid) or _get_miner_evm_address(coldkey)
+        evm_address = self.miner_evm_addresses.get(uid) or evm_mappings.get(coldkey)
         
         if evm_address:
             self.miner_evm_addresses[uid] = evm_address
@@ -18,6 +18,7 @@ setup(
         "fastapi>=0.100.0",
         "uvicorn>=0.23.0",
         "substrate-interface",
+        "orjson>=3",
     ],
     entry_points={
         "console_scripts": [